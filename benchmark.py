@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = 'Markus Thilo'
+__version__ = '0.3_2022-02-22'
+__license__ = 'GPL-3'
+__email__ = 'markus.thilo@gmail.com'
+__status__ = 'Testing'
+__description__ = 'Benchmarks for sqldump2xlsx.py'
+
+from sqlite3 import connect as SqliteConnect
+from subprocess import run
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from argparse import ArgumentParser
+from pathlib import Path
+from sys import executable
+
+SCRIPT = Path(__file__).parent / 'sqldump2xlsx.py'
+
+class Benchmark:
+	'Measure and print times'
+
+	def __init__(self, tempdir, runs=10, rows=100000):
+		'Set working directory, number of runs and rows to write'
+		self.tempdir = tempdir
+		self.runs = runs
+		self.rows = rows
+
+	def measure(self, name, function):
+		'Run function multiple times and print best and mean time'
+		times = list()
+		for run_cnt in range(self.runs):
+			start = perf_counter()
+			function(run_cnt)
+			times.append(perf_counter() - start)
+		print(f'{name}: best {min(times)*1000:.1f} ms, mean {sum(times)/len(times)*1000:.1f} ms')
+		return min(times)
+
+	def mk_sqlite(self, rows=10):
+		'Generate small SQLite db'
+		sqlitefile = self.tempdir / 'small.db'
+		db = SqliteConnect(sqlitefile)
+		db.execute('CREATE TABLE test (id, text);')
+		db.executemany('INSERT INTO test VALUES (?, ?);', ( (str(i), f'row {i}') for i in range(rows) ))
+		db.commit()
+		db.close()
+		return sqlitefile
+
+	def startup(self):
+		'Interpreter startup, import and conversion of a small SQLite db to CSV'
+		sqlitefile = self.mk_sqlite()
+		self.measure('python -c pass', lambda run_cnt:
+			run([executable, '-c', 'pass'], check=True)
+		)
+		self.measure('import sqldump2xlsx', lambda run_cnt:
+			run([executable, '-c', 'import sqldump2xlsx'], cwd=SCRIPT.parent, check=True)
+		)
+		self.measure('small SQLite db to CSV', lambda run_cnt:
+			run([executable, SCRIPT, '-c',
+				'-o', self.tempdir / f'csv_{run_cnt}',
+				sqlitefile
+			], check=True, capture_output=True)
+		)
+
+	def writers(self):
+		'Write the same rows with every registered writer'
+		from sqldump2xlsx import WRITERS
+		table = {'tablename': 'test', 'colnames': [ f'column_{col}' for col in range(10) ]}
+		rows = [ tuple( f'value {row} {col}' for col in range(10) ) for row in range(self.rows) ]
+		def write(Writer, run_cnt):
+			outdir = self.tempdir / f'{Writer.__name__}_{run_cnt}'
+			outdir.mkdir()
+			writetable = Writer(table, outdir=outdir)
+			for row in rows:
+				writetable.append(row)
+			writetable.close()
+		for name, Writer in WRITERS.items():
+			try:
+				best = self.measure(f'{name} ({self.rows} rows)', lambda run_cnt: write(Writer, run_cnt))
+			except ImportError as ex:
+				print(f'{name}: skipped, {ex}')
+				continue
+			print(f'{name}: {self.rows / best:.0f} rows/s')
+
+if __name__ == '__main__':	# start here if called as application
+	argparser = ArgumentParser(description=__description__)
+	argparser.add_argument('-r', '--runs', type=int, default=10,
+		help='Number of runs per measurement (default: 10)', metavar='INTEGER'
+	)
+	argparser.add_argument('-n', '--rows', type=int, default=100000,
+		help='Number of rows for writers benchmark (default: 100000)', metavar='INTEGER'
+	)
+	argparser.add_argument('benchmark', nargs='?', choices=('startup', 'writers'), default='startup',
+		help='Benchmark to run (default: startup)'
+	)
+	args = argparser.parse_args()
+	with TemporaryDirectory() as tempdir:
+		benchmark = Benchmark(Path(tempdir), runs=args.runs, rows=args.rows)
+		getattr(benchmark, args.benchmark)()
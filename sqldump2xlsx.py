@@ -8,16 +8,25 @@ __email__ = 'markus.thilo@gmail.com'
 __status__ = 'Testing'
 __description__ = 'Generate Excel files from SQL dump or SQLite database'
 
-from mysql import connector as Mysql
 from sqlite3 import connect as SqliteConnect
-from xlsxwriter import Workbook
 from datetime import datetime
 from csv import writer as csvwriter
+from zipfile import ZipFile, ZIP_DEFLATED
+from math import isfinite
+from json import load as jsonload, dump as jsondump
+from hashlib import sha256
+from os import link
+from shutil import copy2
+from re import compile as recompile, IGNORECASE, DOTALL
+from threading import Thread, Event
+from queue import Queue, Empty, Full
+from time import perf_counter
+from traceback import format_exc
 from argparse import ArgumentParser, FileType
 from pathlib import Path
 
 from sys import exit as sysexit
-from sys import stdout, stderr
+from sys import stdin, stdout, stderr
 
 class Logger:
 	'Simple logging as the standard library is for different needs'
@@ -25,6 +34,7 @@ class Logger:
 	def __init__(self, info=None, logfile=None):
 		'Create logger and logfile'
 		self.info = info
+		self.logfile = logfile
 		if logfile != None:
 			self.logfh = open(logfile, 'wt', encoding='utf8')
 		else:
@@ -41,6 +51,7 @@ class Logger:
 			if filename == None:
 				filename = datetime.now().strftime('%Y-%m-%d_%H%M%S_log.txt')
 			logfile = outdir / filename
+		self.logfile = logfile
 		self.logfh = open(logfile, 'wt', encoding='utf8')
 
 	def put(self, msg):
@@ -77,6 +88,24 @@ class Logger:
 		'Close logfile'
 		self.logfh.close()
 
+class NullLogger:
+	'Ignore all log messages'
+
+	def put(self, msg):
+		'Do nothing'
+		pass
+
+class QueueLogger:
+	'Send log messages from a child process to the main process'
+
+	def __init__(self, queue):
+		'Use given multiprocessing queue'
+		self.queue = queue
+
+	def put(self, msg):
+		'Put message into queue'
+		self.queue.put(('log', msg))
+
 class SQLClient:
 	'Client for a running SQL Server'
 
@@ -84,31 +113,204 @@ class SQLClient:
 			host='localhost',
 			user='root',
 			password='root',
-			database='test'):
+			database='test',
+			sample=0,
+			randomsample=False,
+			chunksize=0,
+			connections=1,
+			retries=3):
 		'Generate client to a given database'
+		from mysql import connector	# import only when needed as it takes time
+		self.mysql = connector
 		self.logger = logger
-		self.db = Mysql.connect(host=host, user=user, password=password, database=database)
+		self.login = {'host': host, 'user': user, 'password': password, 'database': database}
+		self.db = self.connect()
+		self.tablename = None
+		self.chunksize = chunksize
+		self.connections = connections
+		self.retries = retries
+		if sample > 0 and randomsample:
+			self.limit = f' ORDER BY RAND() LIMIT {sample}'
+		elif sample > 0:
+			self.limit = f' LIMIT {sample}'
+		else:
+			self.limit = ''
 
+	def connect(self):
+		'Open connection to database'
+		return self.mysql.connect(**self.login)
 
 	def close(self):
 		'Close connection to database'
 		self.db.close()
 
-	def fetchall(self):
-		'Fetch all tables and put into SQLite db'
+	def disconnect(self, db):
+		'Close given connection, ignore errors as it might be broken'
+		try:
+			db.close()
+		except self.mysql.Error:
+			pass
+
+	def primary_key(self, cursor, tablename):
+		'Get column names of primary key'
+		cursor.execute(f"SHOW KEYS FROM {tablename} WHERE Key_name = 'PRIMARY';")
+		keys = cursor.fetchall()
+		colnames = [ des[0] for des in cursor.description ]
+		seq = colnames.index('Seq_in_index')
+		name = colnames.index('Column_name')
+		return [ key[name] for key in sorted(keys, key=lambda key: key[seq]) ]
+
+	def fetch_page(self, db, query, params):
+		'Execute one query, reconnect and retry on errors'
+		for attempt in range(self.retries + 1):
+			try:
+				cursor = db.cursor()
+				cursor.execute(query, params)
+				return cursor.fetchall(), db
+			except self.mysql.Error as ex:
+				if attempt == self.retries:
+					raise
+				self.logger.put(f'Retrying after error from SQL server: {ex}')
+				self.disconnect(db)
+				db = self.connect()
+
+	def fetch_keyset(self, tablename, pk, pk_idx, first=None, last=None):
+		'Generator to fetch pages of rows ordered by primary key over own connection, key range is first < key <= last'
+		db = self.connect()
+		order = ', '.join( f'`{col}`' for col in pk )
+		keyset = '(' + order + ') > (' + ', '.join( '%s' for col in pk ) + ')'
+		key = first
+		try:
+			while True:
+				conditions = list()
+				params = list()
+				if key != None:
+					conditions.append(keyset)
+					params.extend(key)
+				if last != None:
+					conditions.append(f'`{pk[0]}` <= %s')
+					params.append(last)
+				query = f'SELECT * FROM {tablename}'
+				if conditions:
+					query += ' WHERE ' + ' AND '.join(conditions)
+				query += f' ORDER BY {order} LIMIT {self.chunksize};'
+				rows, db = self.fetch_page(db, query, tuple(params))
+				if rows:
+					yield rows
+				if len(rows) < self.chunksize:
+					break
+				key = [ rows[-1][idx] for idx in pk_idx ]
+		finally:	# also when consumer stops early
+			self.disconnect(db)
+
+	def put(self, queue, item, stop):
+		'Put item into queue, give up when stop is set'
+		while not stop.is_set():
+			try:
+				queue.put(item, timeout=0.1)
+				return True
+			except Full:
+				continue
+		return False
+
+	def fetch_range(self, tablename, pk, pk_idx, first, last, queue, stop, times):
+		'Put pages of one key range into queue until stop is set, runs as thread with its own connection'
+		start = perf_counter()
+		pages = self.fetch_keyset(tablename, pk, pk_idx, first=first, last=last)
+		try:
+			for rows in pages:
+				if not self.put(queue, rows, stop):
+					return
+			times.append(perf_counter() - start)
+			self.put(queue, None, stop)
+		except Exception as ex:
+			self.put(queue, ex, stop)
+		finally:
+			pages.close()	# closes connection
+
+	def fetch_chunks(self, cursor, tablename, pk, colnames):
+		'''Generator to fetch rows in chunks, key ranges are fetched over parallel connections
+		and pages are given in the order they arrive, not ordered by primary key'''
+		pk_idx = [ colnames.index(col) for col in pk ]
+		if self.connections > 1 and len(pk) == 1:
+			cursor.execute(f'SELECT MIN(`{pk[0]}`), MAX(`{pk[0]}`) FROM {tablename};')
+			first, last = cursor.fetchone()
+			if isinstance(first, int) and isinstance(last, int):
+				step = ( last - first ) // self.connections + 1
+				stop = Event()
+				queue = Queue(maxsize=4*self.connections)	# shared by all ranges, so no connection waits for another
+				threads = list()
+				times = list()
+				start = perf_counter()
+				for first_key in range(first - 1, last, step):
+					thread = Thread(target=self.fetch_range,
+						args=(tablename, pk, pk_idx, [first_key], min(first_key + step, last), queue, stop, times),
+						daemon=True
+					)
+					thread.start()
+					threads.append(thread)
+				try:
+					running = len(threads)
+					while running > 0:
+						rows = queue.get()
+						if rows == None:	# one range is complete
+							running -= 1
+							continue
+						if isinstance(rows, Exception):
+							raise rows
+						yield from rows
+				finally:	# on errors or when consumer stops early, threads abandon the queue
+					stop.set()
+					for thread in threads:
+						thread.join()
+				elapsed = perf_counter() - start
+				if elapsed > 0:	# check that the ranges overlap in time
+					self.logger.put(
+						f'Fetched {len(threads)} key ranges of {tablename} in {elapsed:.2f} s, '
+						+ f'{sum(times) / elapsed:.1f} connections busy on average'
+					)
+				return
+		for rows in self.fetch_keyset(tablename, pk, pk_idx):
+			yield from rows
+
+	def fetchtables(self, tables=None):
+		'Generator to fetch all tables or the given ones as table name, column names and rows'
 		cursor = self.db.cursor()
 		cursor.execute('SHOW tables;')
-		tables = cursor.fetchall()
-		for table in tables:
+		for table in cursor.fetchall():
+			if tables != None and not table[0] in tables:
+				continue
+			self.tablename = table[0]
 			tablename = f'`{table[0]}`'
-			cursor.execute(f'SELECT * FROM {tablename};')
+			if self.chunksize > 0 and not self.limit:
+				pk = self.primary_key(cursor, tablename)
+			else:
+				pk = list()
+			if pk:
+				cursor.execute(f'SELECT * FROM {tablename} LIMIT 0;')
+				colnames = [ des[0] for des in cursor.description ]
+				cursor.fetchall()
+				rows = self.fetch_chunks(cursor, tablename, pk, colnames)
+				self.logger.put(f'Fetching {tablename} in chunks of {self.chunksize} rows by primary key')
+			else:
+				cursor.execute(f'SELECT * FROM {tablename}{self.limit};')
+				colnames = [ des[0] for des in cursor.description ]
+				rows = cursor.fetchall()
+			yield self.tablename, colnames, rows
+			if pk:	# stop fetching if rows have not been consumed
+				rows.close()
+
+	def fetchall(self):
+		'Fetch all tables and put into SQLite db'
+		for table, colnames, rows in self.fetchtables():
+			tablename = f'`{table}`'
 			sqlite_cmd = f'CREATE TABLE {tablename} (`'
-			sqlite_cmd += '`, `'.join( e[0] for e in cursor.description )
+			sqlite_cmd += '`, `'.join(colnames)
 			sqlite_cmd += '`);'
 			self.logger.put(f'Executing in SQLite: {sqlite_cmd}')
 			yield sqlite_cmd, ()
 			self.logger.put(f'Filling {tablename}')
-			for row in cursor.fetchall():
+			for row in rows:
 				sqlite_cmd = f'INSERT INTO {tablename} VALUES ('
 				sqlite_cmd += '?, ' * (len(row) - 1)
 				sqlite_cmd += '?);'
@@ -117,43 +319,160 @@ class SQLClient:
 class SQLite:
 	'Read and write SQLite file'
 
-	def __init__(self, logger, sqlitefile):
+	MAGIC = b'SQLite format 3\x00'
+
+	def __init__(self, logger, sqlitefile, readonly=False):
 		'Open database'
-		self.db = SqliteConnect(sqlitefile)
+		if readonly:
+			self.db = SqliteConnect(Path(sqlitefile).resolve().as_uri() + '?mode=ro', uri=True)
+		else:
+			self.db = SqliteConnect(sqlitefile)
 		self.cursor = self.db.cursor()
 		self.logger = logger
+		self.digests = None	# hashes of the tables while filling, see hash_tables()
 
-	def fetchall(self):
-		'Generator to fetch all tables'
+	def deserialize(self, data):
+		'Load database from bytes, e.g. read from stdin'
+		try:
+			self.db.deserialize(data)
+		except AttributeError:
+			raise RuntimeError('Python 3.11 or newer is needed to read SQLite db from stream')
+		self.cursor = self.db.cursor()
+
+	def tablenames(self):
+		'Get names of all tables'
 		self.cursor.execute("SELECT name FROM sqlite_schema WHERE type = 'table';")
-		for table in self.cursor.fetchall():
-			self.logger.put('Fetching data from SQLite DB by SELECT * FROM ' + table[0])
-			self.cursor.execute(f'SELECT * FROM {table[0]};')
-			rows = self.cursor.fetchall()
+		return [ table[0] for table in self.cursor.fetchall() ]
+
+	def count(self, tablename):
+		'Count rows of one table'
+		self.cursor.execute(f'SELECT COUNT(*) FROM {tablename};')
+		return self.cursor.fetchone()[0]
+
+	def fetchall(self, tables=None, sample=0, randomsample=False):
+		'Generator to fetch all tables or the given ones, only sample rows if given'
+		if sample > 0 and randomsample:
+			limit = f' ORDER BY RANDOM() LIMIT {sample}'
+		elif sample > 0:
+			limit = f' LIMIT {sample}'
+		else:
+			limit = ''
+		for tablename in self.tablenames():
+			if tables != None and not tablename in tables:
+				continue
+			self.logger.put(f'Fetching data from SQLite DB by SELECT * FROM {tablename}{limit}')
+			cursor = self.db.cursor()
+			cursor.execute(f'SELECT * FROM {tablename}{limit};')
 			yield {
-				'tablename': table[0],
-				'colnames': list(map(lambda des: des[0], self.cursor.description))
+				'tablename': tablename,
+				'colnames': list(map(lambda des: des[0], cursor.description))
 			}
-			for row in rows:
+			for row in cursor:
 				yield row
 
-	def fill(self, translator):
+	def hash_tables(self):
+		'Hash schema and rows of every table while filling, so fingerprints do not need another scan'
+		self.digests = dict()
+		self.header = recompile(r'\s*(CREATE\s+TABLE|INSERT\s+INTO)\s+([^\s(;]+)', IGNORECASE)
+		self.hash_cmd = None
+
+	def update_digest(self, cmd_str, values):
+		'Add executed command to the hash of its table, rows are summed up as their order may vary'
+		if cmd_str != self.hash_cmd:	# commands repeat for every row
+			self.hash_cmd = cmd_str
+			match = self.header.match(cmd_str)
+			if not match:
+				self.hash_table = None
+				return
+			self.hash_table = match.group(2).strip('`"[]')
+			if match.group(1).upper().startswith('CREATE'):
+				self.digests[self.hash_table] = [sha256(cmd_str.encode('utf8')), 0, 0]
+				return
+		if self.hash_table == None:
+			return
+		digest = self.digests.setdefault(self.hash_table, [sha256(), 0, 0])
+		digest[1] += int.from_bytes(sha256(repr(tuple(values)).encode('utf8')).digest(), 'big')
+		digest[2] += 1
+
+	def fingerprint(self, tablename):
+		'''Hash schema, number of rows and content of one table, use the hash from filling if there is one.
+		Tables of a given SQLite db have not been filled here and are read once more.'''
+		if self.digests != None and tablename in self.digests:
+			digest, row_sum, row_cnt = self.digests[tablename]
+			digest = digest.copy()
+			digest.update(f'{row_sum % 2**256:064x}'.encode('utf8'))
+		else:
+			cursor = self.db.cursor()
+			cursor.execute('SELECT sql FROM sqlite_schema WHERE name = ?;', (tablename,))
+			digest = sha256(repr(cursor.fetchone()).encode('utf8'))
+			row_cnt = 0
+			for row in cursor.execute(f'SELECT * FROM {tablename};'):
+				digest.update(repr(row).encode('utf8'))
+				row_cnt += 1
+		digest.update(f'rows={row_cnt}'.encode('utf8'))
+		return digest.hexdigest()
+
+	def execute(self, cmd_str, values):
+		'Execute one command, errors are logged'
+		try:
+			self.cursor.execute(cmd_str, values)
+		except:
+			self.logger.put('SQLite reported errors while executing '
+				+ cmd_str
+				+ ' with value(s) '
+				+ str(values)
+			)
+			return
+		if self.digests != None:
+			self.update_digest(cmd_str, values)
+
+	def fill(self, translator, total=None, progress=100000):
 		'Fill sqlite db by giving a generator for commands'
+		row_cnt = 0
 		for cmd_str, values in translator():
-			try:
-				self.cursor.execute(cmd_str, values)
-			except:
-				self.logger.put('SQLite reported errors while executing '
-					+ cmd_str
-					+ ' with value(s) '
-					+ str(values)
-				)
+			self.execute(cmd_str, values)
+			if values and total != None:
+				row_cnt += 1
+				if row_cnt % progress == 0:
+					self.logger.put(f'Inserted {row_cnt} of estimated {total} rows')
 		self.db.commit()
 
 	def close(self):
 		'Close SQLite database'
 		self.db.close()
 
+class PeekStream:
+	'Binary stream that does not need seeking to check the first bytes, e.g. stdin'
+
+	def __init__(self, stream, size=16):
+		'Read first bytes'
+		self.stream = stream
+		self.head = stream.read(size)
+		self.buffer = self.head
+
+	def readline(self):
+		'Read one line, starting with the peeked bytes'
+		if self.buffer:
+			eol = self.buffer.find(b'\n') + 1
+			if eol:
+				line = self.buffer[:eol]
+				self.buffer = self.buffer[eol:]
+				return line
+			line = self.buffer + self.stream.readline()
+			self.buffer = b''
+			return line
+		return self.stream.readline()
+
+	def read(self):
+		'Read everything'
+		data = self.buffer + self.stream.read()
+		self.buffer = b''
+		return data
+
+	def close(self):
+		'Leave the stream open as it was opened by the caller'
+		pass
+
 class SQLDump:
 	'Handle dump file'
 
@@ -211,14 +530,56 @@ class SQLDump:
 		'WHERE'
 	)
 
-	def __init__(self, dumpfile):
-		'Create object for one sql dump file'
-		self.dumpfh = open(dumpfile, 'rt', encoding='utf8')
+	QUOTE_END = {
+		'\'': recompile(r"['\\]"),
+		'"': recompile(r'["\\]'),
+		'`': recompile(r'[`\\]')
+	}
+
+	def __init__(self, dumpfile=None, segments=None, stream=None):
+		'Create object for one sql dump file or binary stream, optionally only read given byte ranges'
+		if stream != None:
+			self.dumpfh = stream
+			self.readline = self.readline_stream
+		elif segments == None:
+			self.dumpfh = open(dumpfile, 'rt', encoding='utf8')
+			self.readline = self.dumpfh.readline
+		else:
+			self.dumpfh = open(dumpfile, 'rb')
+			self.segments = iter(segments)
+			self.seg_pos = 0
+			self.seg_end = 0
+			self.readline = self.readline_segments
 
 	def close(self):
 		'Close SQL dump file'
 		self.dumpfh.close()
 
+	def decode(self, rawline):
+		'Decode line read in binary mode'
+		line = rawline.decode('utf8')
+		if line.endswith('\r\n'):	# same as universal newlines in text mode
+			return line[:-2] + '\n'
+		return line
+
+	def readline_stream(self):
+		'Read next line from binary stream'
+		return self.decode(self.dumpfh.readline())
+
+	def readline_segments(self):
+		'Read next line from the given byte ranges'
+		while True:
+			if self.seg_pos < self.seg_end:
+				rawline = self.dumpfh.readline(self.seg_end - self.seg_pos)
+				if rawline:
+					self.seg_pos += len(rawline)
+					return self.decode(rawline)
+			try:
+				self.seg_pos, self.seg_end = next(self.segments)
+			except StopIteration:
+				return ''
+			self.dumpfh.seek(self.seg_pos)
+
 	def get_char(self, line):
 		'Fetch the next character'
 		if not line:
@@ -236,46 +597,88 @@ class SQLDump:
 		return word, char, line
 
 	def fetch_quotes(self, quote, line):
-		'Fetch everything inside quotes'
+		'Fetch everything inside quotes, also over several lines, escapes and doubled quotes are kept'
 		text = ''
-		while line:
-			char, line = self.get_char(line)
-			if not char:	# read next line if line is empty
-				line = self.dumpfh.readline()
+		while True:
+			if not line:	# read next line inside quotes
+				line = self.readline()
 				if not line:	# eof
 					break
-				text += '\\n'	# generate newline char
+			match = self.QUOTE_END[quote].search(line)	# jump to next quote or backslash
+			if match == None:
+				text += line
+				line = ''
 				continue
+			text += line[:match.start()]
+			char, line = match.group(), line[match.end():]
 			if char == '\\':	# get next char when escaped
-				nextchar, line = self.get_char(line)
-				if nextchar == None:
-					continue
-				text += char + nextchar
+				text += char + line[:1]
+				line = line[1:]
 				continue
-			if char == quote:
-				break
-			text += char
+			if line[:1] == quote:	# doubled quote is part of the text
+				text += quote + quote
+				line = line[1:]
+				continue
+			break
 		return text, line
 
-	def read_cmds(self):
-		'Line by line'
+	def skip_table(self, tablename):
+		'Skip the following INSERT commands of the given table, name is normalized like the headers'
+		self.skip = DumpIndex.tablename(tablename)
+
+	def skip_lines(self):
+		'Read lines without tokenizing until the next command not inserting into the skipped table'
+		header = recompile(DumpIndex.HEADER, IGNORECASE)
+		start = True	# only lines starting a statement can be headers
+		while True:
+			line = self.readline()
+			if not line:	# eof
+				return ''
+			match = header.match(line) if start else None
+			if match and not (
+				match.group(1).upper().startswith('INSERT')
+				and DumpIndex.tablename(match.group(2)) == self.skip
+			):
+				return line.lstrip(' \t')
+			stripped = line.strip()
+			if stripped and not stripped.startswith('--'):	# blank and comment lines do not end statements
+				start = stripped.endswith(';')
+
+	def skip_copy(self):
+		'Read lines without tokenizing until the end of COPY data'
+		while True:
+			line = self.readline()
+			if not line or line.strip() == '\\.':
+				return
+
+	def read_cmds(self, limit=None):
+		'Line by line, stop after limit elements if given'
 		line = '\n'
 		char = '\n'
 		cmd = list()
+		self.skip = None
+		self.truncated = False
 		while char:	# loop until eof
+			if limit != None and len(cmd) >= limit:
+				self.truncated = True
+				yield cmd
+				return
 			if char == ';':	# give back whole comment on ;
 				yield cmd
 				cmd = list()
+				if self.skip != None:	# ignore rest of line and skip lines
+					line = self.skip_lines()
+					self.skip = None
 			elif char == '\\':	# \.
 				char, line = self.get_char(line)
 				if char == '.':
 					yield cmd
 					cmd = list()
 				else:
-					cmd += '\\' + char
+					cmd.append('\\' + char)
 			elif char in '(),':	# special chars
 				cmd.append(char)
-			elif char.isalnum():	# instruction or argument
+			elif char.isalnum() or char in '-+.' and line[:1].isdigit():	# instruction, argument or signed number
 				word, char, line = self.get_word(char + line)
 				cmd.append(word)
 				continue
@@ -283,26 +686,153 @@ class SQLDump:
 				text, line = self.fetch_quotes(char, line)
 				cmd.append(char + text + char)
 			while not line or line == '\n':	# read from dumpfile
-				line = self.dumpfh.readline()
+				line = self.readline()
 				if not line:	# eof
 					char = ''
 					break
 				line = line.lstrip(' \t')	# skip leading blanks
-				if line[0] in '-/':	# ignore comments and unimportand lines
+				if line.startswith(('--', '/*')):	# ignore comments and unimportand lines
 					line = ''
 					continue
 			char, line = self.get_char(line)	# char by char
 		if cmd != list():	# tolerate missing last ;
 			yield cmd
 
+class DumpIndex:
+	'Byte positions and estimated row counts of the tables in a SQL dump file'
+
+	HEADER = r'\s*(CREATE\s+TABLE(?:\s+IF\s+NOT\s+EXISTS)?|INSERT\s+INTO|COPY)\s+([^\s(;]+)'
+	SUFFIX = '.idx'
+	VERSION = 2	# increase when the scan changes to rebuild old index files
+
+	def __init__(self, logger, dumpfile):
+		'Load index from sidecar file or scan the dump file and write sidecar'
+		self.logger = logger
+		self.dumpfile = dumpfile
+		self.idxfile = dumpfile.with_name(dumpfile.name + self.SUFFIX)
+		stat = dumpfile.stat()
+		self.signature = [self.VERSION, stat.st_size, stat.st_mtime_ns]
+		if not self.load():
+			self.build()
+			self.save()
+
+	@staticmethod
+	def tablename(name):
+		'Normalize table name from header, ignore schema and quotes'
+		return name.split('.')[-1].strip('`"[]')
+
+	def load(self):
+		'Read sidecar file if it matches the dump file'
+		try:
+			with open(self.idxfile, 'rt', encoding='utf8') as idxfh:
+				idx = jsonload(idxfh)
+		except (OSError, ValueError):
+			return False
+		if idx.get('signature') != self.signature:
+			self.logger.put(f'Index {self.idxfile.name} is outdated')
+			return False
+		self.tables = idx['tables']
+		self.logger.put(f'Using index {self.idxfile.name}')
+		return True
+
+	def save(self):
+		'Write sidecar file'
+		try:
+			with open(self.idxfile, 'wt', encoding='utf8') as idxfh:
+				jsondump({'signature': self.signature, 'tables': self.tables}, idxfh)
+		except OSError:
+			self.logger.put(f'Could not write index {self.idxfile}')
+
+	def build(self):
+		'Scan dump file line by line for CREATE TABLE, INSERT INTO and COPY'
+		self.logger.put(f'Indexing {self.dumpfile.name}')
+		header = recompile(self.HEADER.encode(), IGNORECASE)
+		rowsep = recompile(rb'\)\s*,\s*\(')
+		self.tables = dict()
+		segment = None
+		table = None
+		kind = None
+		pos = 0
+		prevline = b''
+		start = True	# only lines starting a statement can be headers, not e.g. a column named copy
+		with open(self.dumpfile, 'rb') as dumpfh:
+			for line in dumpfh:
+				if kind == b'COPY':	# one row per line until \.
+					if line.rstrip() == b'\\.':
+						kind = None
+						start = True
+					else:
+						self.tables[table]['rows'] += 1
+					pos += len(line)
+					continue
+				match = header.match(line) if start else None
+				if match:
+					kind = match.group(1)[:6].upper()
+					name = self.tablename(match.group(2).decode('utf8', errors='replace'))
+					if name != table:
+						if segment != None:
+							segment[1] = pos
+						segment = [pos, None]
+						self.tables.setdefault(name, {'rows': 0, 'segments': list()})
+						self.tables[name]['segments'].append(segment)
+						table = name
+					if kind == b'INSERT':
+						self.tables[table]['rows'] += 1 + len(rowsep.findall(line))
+				elif kind == b'INSERT':	# rows in following lines
+					self.tables[table]['rows'] += len(rowsep.findall(line))
+					if prevline.rstrip().endswith(b',') and line.lstrip().startswith(b'('):
+						self.tables[table]['rows'] += 1
+				stripped = line.strip()
+				if stripped and not stripped.startswith(b'--'):	# blank and comment lines do not end statements
+					start = stripped.endswith(b';')
+				prevline = line
+				pos += len(line)
+		if segment != None:
+			segment[1] = pos
+		self.logger.put(f'Found {len(self.tables)} table(s) in {self.dumpfile.name}')
+
+	def rows(self, tables=None):
+		'Give estimated number of rows'
+		if tables == None:
+			tables = self.tables
+		return sum( self.tables[table]['rows'] for table in tables if table in self.tables )
+
+	def segments(self, tables=None):
+		'Give byte ranges of the tables in the order of the dump file'
+		if tables == None:
+			tables = self.tables
+		segments = list()
+		for table in tables:
+			try:
+				segments.extend(self.tables[table]['segments'])
+			except KeyError:
+				raise RuntimeError(f'Table {table} not found in {self.dumpfile.name}')
+		return sorted(segments)
+
 class SQLDecoder:
 	'Decode SQL dump to SQLite compatible commands'
 
-	def __init__(self, logger, dumpfile):
-		'Generate decoder for SQL dump file'
+	ESCAPES = {'0': '\x00', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a', '%': '\\%', '_': '\\_'}
+	UNESCAPE = {	# backslash escapes and doubled quotes inside quotes
+		'\'': recompile(r"\\(.)|''", DOTALL),
+		'"': recompile(r'\\(.)|""', DOTALL),
+		'`': recompile(r'\\(.)|``', DOTALL)
+	}
+
+	def __init__(self, logger, dumpfile=None, segments=None, sample=0, stream=None, typed=False):
+		'Generate decoder for SQL dump file or stream, stop after sample rows per table if given'
 		self.logger = logger
-		self.name = dumpfile.stem
-		self.sqldump = SQLDump(dumpfile)
+		self.sqldump = SQLDump(dumpfile, segments=segments, stream=stream)
+		self.tablename = None
+		self.colnames = dict()	# column names of the tables from CREATE TABLE
+		self.columns = None	# column names of the current command
+		self.typed = typed
+		if typed:
+			self.convert = self.typify
+		else:
+			self.convert = self.unbracket
+		self.sample = sample
+		self.row_cnts = dict()
 
 	def close(self):
 		'Close SQL dump'
@@ -384,10 +914,56 @@ class SQLDecoder:
 		'Generate string linke (?, ?, ?) from a list of elements'
 		return ' (' + '?, ' * (len(in_brackets) - 1) + '?)'
 
-	def unbracket(self, in_brackets):
-		'Remove brackets from strings in an iterable'
+	def sample_complete(self):
+		'Count row and check if sample of current table is complete'
+		self.row_cnts[self.tablename] = self.row_cnts.get(self.tablename, 0) + 1
+		if self.row_cnts[self.tablename] == self.sample:
+			self.logger.put(f'Sample of {self.sample} rows from {self.tablename} is complete, skipping rest of table')
+		return self.row_cnts[self.tablename] >= self.sample
+
+	def get_tablename(self, first_part_cmd):
+		'Get table name without quotes from the elements in front of the definitions or values'
+		if first_part_cmd == list():
+			return None
+		return first_part_cmd[-1].strip('\'"`')
+
+	def unbracket(self, in_brackets, copy=False):
+		'Remove brackets from strings in an iterable, values of COPY are given as they are'
+		if copy:
+			return in_brackets
 		return [ string.strip('\'"`') for string in in_brackets ]
 
+	def unescape(self, element):
+		'Give text of a quoted SQL literal with backslash escapes and doubled quotes resolved'
+		quote, text = element[0], element[1:-1]
+		if not '\\' in text and not quote + quote in text:
+			return text
+		return self.UNESCAPE[quote].sub(
+			lambda match: quote if match.group(1) == None else self.ESCAPES.get(match.group(1), match.group(1)),
+			text
+		)
+
+	def typify(self, in_brackets, copy=False):
+		'''Convert elements to int, float, None or string. Values of COPY are not quoted,
+		they stay strings and only \\N is None.'''
+		if copy:
+			return [ None if element == '\\N' else element for element in in_brackets ]
+		values = list()
+		for element in in_brackets:
+			if element[:1] and element[:1] in '\'"`':
+				values.append(self.unescape(element))
+			elif element.upper() == 'NULL':
+				values.append(None)
+			else:
+				try:
+					values.append(int(element))
+				except ValueError:
+					try:
+						values.append(float(element))
+					except ValueError:
+						values.append(element)
+		return values
+
 	def transall(self):
 		'Fetch all tables'
 		for raw_cmd in self.sqldump.read_cmds():
@@ -400,10 +976,13 @@ class SQLDecoder:
 				first_part_cmd, matching, part_cmd = self.seek_strings(part_cmd, '(')
 				if not matching:	# skip if no definitions in ()
 					continue
+				self.tablename = self.get_tablename(first_part_cmd)
 				cmd_str += self.el2str(first_part_cmd)
 				in_brackets, part_cmd = self.get_list(part_cmd)
 				if in_brackets == list():
 					continue
+				self.colnames[self.tablename] = self.unbracket(in_brackets)
+				self.columns = self.colnames[self.tablename]
 				cmd_str += self.list2str(in_brackets) + ';'
 				self.logger.put('Generating table in SQLite DB by ' + cmd_str)
 				yield cmd_str, ()
@@ -416,8 +995,14 @@ class SQLDecoder:
 				first_part_cmd, matching, part_cmd = self.seek_strings(part_cmd, '(', 'VALUES')
 				if not matching:	# skip if no nothing to insert
 					continue
+				self.tablename = self.get_tablename(first_part_cmd)
+				if self.sample > 0 and self.row_cnts.get(self.tablename, 0) >= self.sample:
+					self.sqldump.skip_table(self.tablename)
+					continue
+				self.columns = self.colnames.get(self.tablename)
 				if matching == '(':
 					in_brackets, part_cmd = self.get_list(part_cmd)
+					self.columns = self.unbracket(in_brackets)
 					cmd_str += self.el2str(first_part_cmd) + self.list2str(in_brackets)
 					first_part_cmd, matching, part_cmd = self.seek_strings(part_cmd, 'VALUES')
 				base_str = cmd_str + self.el2str(first_part_cmd) + ' VALUES'
@@ -429,7 +1014,10 @@ class SQLDecoder:
 					in_brackets, part_cmd = self.get_list(part_cmd)
 					cmd_str = base_str + self.list2qmarks(in_brackets)
 					first_part_cmd, matching, part_cmd = self.seek_strings(part_cmd, ',', ';')
-					yield cmd_str + ';', self.unbracket(in_brackets)
+					yield cmd_str + ';', self.convert(in_brackets)
+					if self.sample > 0 and self.sample_complete():
+						self.sqldump.skip_table(self.tablename)
+						break
 					if matching == ';' :
 						break
 					continue
@@ -438,22 +1026,35 @@ class SQLDecoder:
 				if not matching:	# skip if no nothing to insert
 					continue
 				in_brackets, part_cmd = self.get_list(part_cmd)
+				self.tablename = self.get_tablename(first_part_cmd[:1])
+				self.columns = self.unbracket(in_brackets)
 				base_str = f'INSERT INTO `{first_part_cmd[0]}`' + self.list2quotes(in_brackets)
 				self.logger.put(f'Putting data to SQLite DB by {base_str} from original command {cmd_str}')
-				values = next(self.sqldump.read_cmds())
 				set_len = len(in_brackets)
+				if self.sample > 0:
+					remaining = self.sample - self.row_cnts.get(self.tablename, 0)
+					values = next(self.sqldump.read_cmds(limit=max(remaining, 0)*set_len))
+					if self.sqldump.truncated:
+						self.sqldump.skip_copy()
+					self.row_cnts[self.tablename] = self.row_cnts.get(self.tablename, 0) + len(values) // max(set_len, 1)
+				else:
+					values = next(self.sqldump.read_cmds())
 				base_str += ' VALUES' + self.list2qmarks(in_brackets) + ';'
 				for value_ptr in range(0, len(values), set_len):	# loop through values
-					yield base_str, values[value_ptr:value_ptr+set_len]
+					yield base_str, self.convert(values[value_ptr:value_ptr+set_len], copy=True)
 
 class Excel:
 	'Write to Excel File'
 
+	EXTENSION = '.xlsx'
+	REQUIRES = 'xlsxwriter'	# checked before parsing as it is imported only when needed
+
 	def __init__(self, table, outdir=Path(), maxfieldsize=255, maxtnamewidth=31):
 		'Generate Excel file and writer'
+		from xlsxwriter import Workbook	# import only when needed as it takes time
 		self.tablename = table['tablename']
 		self.maxfieldsize = maxfieldsize
-		self.filename = self.tablename + '.xlsx'
+		self.filename = self.tablename + self.EXTENSION
 		self.workbook = Workbook(outdir / self.filename,
 			{
 				'use_zip64': True,
@@ -483,13 +1084,181 @@ class Excel:
 		'Close file = write Excel file'
 		self.workbook.close()
 
+class ExcelStream:
+	'Write Excel file by streaming worksheet XML row by row into the zip file'
+
+	EXTENSION = '.xlsx'
+	REQUIRES = None
+	MAXROWS = 1048576
+	MAXCELLSIZE = 32767
+	BUFFERSIZE = 1000
+	CONTROLCHARS = recompile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+	ESCAPED = recompile('(_x[0-9A-Fa-f]{4}_)')
+	XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+	CONTENT_TYPES = XML + (
+		'<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+		'<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+		'<Default Extension="xml" ContentType="application/xml"/>'
+		'<Override PartName="/xl/workbook.xml" '
+		'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+		'<Override PartName="/xl/worksheets/sheet1.xml" '
+		'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+		'<Override PartName="/xl/styles.xml" '
+		'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+		'</Types>'
+	)
+	RELS = XML + (
+		'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+		'<Relationship Id="rId1" '
+		'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+		'Target="xl/workbook.xml"/>'
+		'</Relationships>'
+	)
+	WORKBOOK = XML + (
+		'<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+		'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+		'<fileSharing readOnlyRecommended="1"/>'
+		'<sheets><sheet name="{}" sheetId="1" r:id="rId1"/></sheets>'
+		'</workbook>'
+	)
+	WORKBOOK_RELS = XML + (
+		'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+		'<Relationship Id="rId1" '
+		'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+		'Target="worksheets/sheet1.xml"/>'
+		'<Relationship Id="rId2" '
+		'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+		'Target="styles.xml"/>'
+		'</Relationships>'
+	)
+	STYLES = XML + (
+		'<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+		'<fonts count="2">'
+		'<font><sz val="11"/><name val="Calibri"/><family val="2"/><scheme val="minor"/></font>'
+		'<font><b/><sz val="11"/><name val="Calibri"/><family val="2"/><scheme val="minor"/></font>'
+		'</fonts>'
+		'<fills count="2"><fill><patternFill patternType="none"/></fill>'
+		'<fill><patternFill patternType="gray125"/></fill></fills>'
+		'<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+		'<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+		'<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+		'<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+		'<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+		'</styleSheet>'
+	)
+	SHEET_HEAD = XML + (
+		'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+		'<sheetData>'
+	)
+	SHEET_TAIL = '</sheetData></worksheet>'
+
+	def __init__(self, table, outdir=Path(), maxfieldsize=255, maxtnamewidth=31):
+		'Generate Excel file, write everything but the worksheet and build row template'
+		self.tablename = table['tablename']
+		if maxfieldsize > 0:
+			self.maxfieldsize = min(maxfieldsize, self.MAXCELLSIZE)
+		else:
+			self.maxfieldsize = self.MAXCELLSIZE
+		self.filename = self.tablename + self.EXTENSION
+		self.zipfile = ZipFile(outdir / self.filename, 'w', compression=ZIP_DEFLATED)
+		self.zipfile.writestr('[Content_Types].xml', self.CONTENT_TYPES)
+		self.zipfile.writestr('_rels/.rels', self.RELS)
+		self.zipfile.writestr('xl/workbook.xml', self.WORKBOOK.format(self.sheetname(maxtnamewidth)))
+		self.zipfile.writestr('xl/_rels/workbook.xml.rels', self.WORKBOOK_RELS)
+		self.zipfile.writestr('xl/styles.xml', self.STYLES)
+		self.sheet = self.zipfile.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)
+		self.sheet.write(self.SHEET_HEAD.encode('utf8'))
+		self.cols = [ self.colname(col) for col in range(len(table['colnames'])) ]
+		self.template = '<row r="{0}">' + ''.join(	# used when all values are strings
+			f'<c r="{col}{{0}}" t="inlineStr"><is><t xml:space="preserve">{{{idx}}}</t></is></c>'
+			for idx, col in enumerate(self.cols, start=1)
+		) + '</row>'
+		self.buffer = [ '<row r="1">' + ''.join(
+			f'<c r="{col}1" s="1" t="inlineStr"><is><t xml:space="preserve">{self.escape(str(colname))}</t></is></c>'
+			for col, colname in zip(self.cols, table['colnames'])
+		) + '</row>' ]
+		self._row_cnt = 1
+
+	def colname(self, col):
+		'Give column name as A, B, ..., AA, AB, ...'
+		name = ''
+		col += 1
+		while col > 0:
+			col, rem = divmod(col - 1, 26)
+			name = chr(65 + rem) + name
+		return name
+
+	def sheetname(self, maxtnamewidth):
+		'Build valid worksheet name from table name, escaped for the XML attribute'
+		name = ''.join( '_' if char in '[]:*?/\\' else char for char in self.tablename[:maxtnamewidth] )
+		if name.startswith("'"):
+			name = '_' + name[1:]
+		if name.endswith("'"):
+			name = name[:-1] + '_'
+		if not name:
+			name = 'Sheet1'
+		return self.escape(name).replace('"', '&quot;').replace("'", '&apos;')
+
+	def escape(self, value):
+		'''Escape string for XML, control characters are written as _xHHHH_ and literal _xHHHH_
+		as _x005F_xHHHH_ like XlsxWriter does'''
+		value = value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+		if '_x' in value:
+			value = self.ESCAPED.sub(r'_x005F\1', value)
+		if not value.isprintable():
+			value = self.CONTROLCHARS.sub(lambda match: f'_x{ord(match.group()):04X}_', value)
+		return value
+
+	def cell(self, ref, value):
+		'Build XML of one cell with any type'
+		if value == None:
+			return ''
+		if isinstance(value, (int, float)) and not isinstance(value, bool) and isfinite(value):
+			return f'<c r="{ref}"><v>{value}</v></c>'
+		if isinstance(value, bytes):
+			value = value.decode('utf8', errors='replace')
+		elif not isinstance(value, str):
+			value = str(value)
+		return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{self.escape(value[:self.maxfieldsize])}</t></is></c>'
+
+	def append(self, row):
+		'Append one row to worksheet'
+		if self._row_cnt >= self.MAXROWS:	# ignore rows that do not fit into worksheet
+			return
+		self._row_cnt += 1
+		try:
+			self.buffer.append(self.template.format(self._row_cnt,
+				*( self.escape(value[:self.maxfieldsize]) for value in row )
+			))
+		except (TypeError, IndexError):	# not all values are strings or row is shorter
+			self.buffer.append(f'<row r="{self._row_cnt}">' + ''.join(
+				self.cell(f'{col}{self._row_cnt}', value) for col, value in zip(self.cols, row)
+			) + '</row>')
+		if len(self.buffer) >= self.BUFFERSIZE:
+			self.flush()
+
+	def flush(self):
+		'Write buffered rows into zip file'
+		self.sheet.write(''.join(self.buffer).encode('utf8'))
+		self.buffer = list()
+
+	def close(self):
+		'Finish worksheet and close zip file'
+		self.flush()
+		self.sheet.write(self.SHEET_TAIL.encode('utf8'))
+		self.sheet.close()
+		self.zipfile.close()
+
 class Csv:
 	'Write to CSV files'
 
+	EXTENSION = '.csv'
+	REQUIRES = None
+
 	def __init__(self, table, outdir=Path(), maxfieldsize=255):
 		'Generate CSV file and writer'
 		self.tablename = table['tablename']
-		self.filename = table['tablename'] + '.csv'
+		self.filename = table['tablename'] + self.EXTENSION
 		self.maxfieldsize = maxfieldsize
 		self.csvfh = open(outdir / self.filename, 'w', encoding='utf-8', newline='')
 		self.writer = csvwriter(self.csvfh, dialect='excel', delimiter='\t')
@@ -506,63 +1275,607 @@ class Csv:
 		'Close file'
 		self.csvfh.close()
 
+class Parquet:
+	'Write to Parquet files, all columns as strings (needs pyarrow)'
+
+	EXTENSION = '.parquet'
+	REQUIRES = 'pyarrow'
+	BATCHSIZE = 10000
+
+	def __init__(self, table, outdir=Path(), maxfieldsize=255):
+		'Generate Parquet file and writer'
+		import pyarrow	# import only when needed as it takes time
+		from pyarrow.parquet import ParquetWriter
+		self.pyarrow = pyarrow
+		self.tablename = table['tablename']
+		self.filename = table['tablename'] + self.EXTENSION
+		self.maxfieldsize = maxfieldsize
+		self.schema = pyarrow.schema([ ( str(colname), pyarrow.string() ) for colname in table['colnames'] ])
+		self.writer = ParquetWriter(outdir / self.filename, self.schema)
+		self.rows = list()
+
+	def field(self, value):
+		'Convert value to string or None'
+		if value == None:
+			return None
+		if not isinstance(value, str):
+			value = str(value)
+		if self.maxfieldsize > 0:
+			return value[:self.maxfieldsize]
+		return value
+
+	def append(self, row):
+		'Append one row, rows are written in batches'
+		self.rows.append(row)
+		if len(self.rows) >= self.BATCHSIZE:
+			self.flush()
+
+	def flush(self):
+		'Write buffered rows as record batch'
+		if self.rows == list():
+			return
+		columns = [ list() for field in self.schema ]
+		for row in self.rows:
+			for col, value in zip(columns, row):
+				col.append(self.field(value))
+		self.writer.write_batch(self.pyarrow.record_batch(
+			[ self.pyarrow.array(col, type=self.pyarrow.string()) for col in columns ],
+			schema = self.schema
+		))
+		self.rows = list()
+
+	def close(self):
+		'Write remaining rows and close file'
+		self.flush()
+		self.writer.close()
+
+class Sink:
+	'Give rows to a writer running in its own thread through a bounded queue'
+
+	def __init__(self, writetable, queuesize=64):
+		'Start thread for given writer object'
+		self.writetable = writetable
+		self.queue = Queue(maxsize=queuesize)
+		self.error = None
+		self.thread = Thread(target=self.run, daemon=True)
+		self.thread.start()
+
+	def run(self):
+		'Append rows until None is given'
+		while True:
+			batch = self.queue.get()
+			if batch == None:
+				break
+			if self.error != None:	# drain queue after error
+				continue
+			try:
+				for row in batch:
+					self.writetable.append(row)
+			except Exception as ex:
+				self.error = ex
+		try:	# close file also after error
+			self.writetable.close()
+		except Exception as ex:
+			if self.error == None:
+				self.error = ex
+
+	def put(self, batch):
+		'Put list of rows into queue'
+		self.queue.put(batch)
+
+	def close(self):
+		'Wait for writer to finish, give error or None'
+		self.queue.put(None)
+		self.thread.join()
+		return self.error
+
+class Stage:
+	'Measure busy and waiting time of one pipeline stage'
+
+	def __init__(self, name, busy=0.0, wait=0.0):
+		'Start measuring'
+		self.name = name
+		self.busy = busy
+		self.wait = wait
+		self.mark = perf_counter()
+
+	def working(self):
+		'Stop waiting, start working'
+		now = perf_counter()
+		self.wait += now - self.mark
+		self.mark = now
+
+	def waiting(self):
+		'Stop working, start waiting'
+		now = perf_counter()
+		self.busy += now - self.mark
+		self.mark = now
+
+	def report(self):
+		'Give utilization as string'
+		total = self.busy + self.wait
+		if total > 0:
+			utilization = 100 * self.busy / total
+		else:
+			utilization = 0
+		return f'Stage {self.name}: busy {self.busy:.2f}s, waiting {self.wait:.2f}s, utilization {utilization:.0f}%'
+
+class Parser:
+	'Run SQL dump decoder or SQL client in its own process, send batches of commands'
+
+	def __init__(self, queue, Source, method, batchsize=1000, **kwargs):
+		'Prepare parser, the source is generated in the child process'
+		self.queue = queue
+		self.Source = Source
+		self.method = method
+		self.batchsize = batchsize
+		self.kwargs = kwargs
+
+	def run(self):
+		'Put batches of commands for one table each into the queue'
+		stage = Stage('parse')
+		try:
+			source = self.Source(QueueLogger(self.queue), **self.kwargs)
+			tablename = None
+			batch = list()
+			for cmd in getattr(source, self.method)():
+				if source.tablename != tablename or len(batch) >= self.batchsize:
+					if batch:
+						stage.waiting()
+						self.queue.put(('cmds', tablename, batch))
+						stage.working()
+					tablename = source.tablename
+					batch = list()
+				batch.append(cmd)
+			if batch:
+				stage.waiting()
+				self.queue.put(('cmds', tablename, batch))
+				stage.working()
+			source.close()
+			stage.waiting()
+			self.queue.put(('done', stage.busy, stage.wait))
+		except:
+			self.queue.put(('error', format_exc()))
+
+class DumpTables:
+	'Group typed rows decoded from SQL dump by table'
+
+	def __init__(self, decoder, batchsize=1000, tables=None):
+		'Use given SQLDecoder'
+		self.decoder = decoder
+		self.cmds = decoder.transall()
+		self.batchsize = batchsize
+		self.tables = tables
+
+	def next_row(self):
+		'Get table name and row of the next command with values, None at the end'
+		for cmd_str, values in self.cmds:
+			if values:
+				schema_cols = self.decoder.colnames.get(self.decoder.tablename)
+				if schema_cols != None and self.decoder.columns != schema_cols:	# sort by CREATE TABLE
+					row = dict(zip(self.decoder.columns, values))
+					values = [ row.get(col) for col in schema_cols ]
+				return self.decoder.tablename, tuple(values)
+		return None
+
+	def batches(self, tablename):
+		'Generator for lists of rows as long as rows belong to given table'
+		batch = list()
+		while self.pending != None and self.pending[0] == tablename:
+			batch.append(self.pending[1])
+			self.pending = self.next_row()
+			if len(batch) >= self.batchsize:
+				yield batch
+				batch = list()
+		if batch:
+			yield batch
+
+	def schema(self, tablename):
+		'Give table name and column names'
+		return {
+			'tablename': tablename,
+			'colnames': self.decoder.colnames.get(tablename, self.decoder.columns)
+		}
+
+	def __iter__(self):
+		'Generator for ( schema, batches ), tables without rows come last'
+		given = set()
+		self.pending = self.next_row()
+		while self.pending != None:
+			tablename = self.pending[0]
+			if self.tables == None or tablename in self.tables:
+				given.add(tablename)
+				yield self.schema(tablename), self.batches(tablename)
+			while self.pending != None and self.pending[0] == tablename:	# skip rows not consumed
+				self.pending = self.next_row()
+		for tablename in self.decoder.colnames:
+			if not tablename in given and ( self.tables == None or tablename in self.tables ):
+				yield self.schema(tablename), iter(())
+
+def batched(rows, batchsize):
+	'Generator for lists of rows'
+	batch = list()
+	for row in rows:
+		batch.append(row)
+		if len(batch) >= batchsize:
+			yield batch
+			batch = list()
+	if batch:
+		yield batch
+
+def iter_tables(source=None, batchsize=1000, tables=None, sample=0, **login):
+	'''Generator for ( schema, batches ) of every table, schema is a dict with tablename and colnames,
+	batches gives lists of typed row tuples. Source is a SQL dump or SQLite file, - for stdin, a binary
+	stream or None to connect to a SQL server with the given login (host, user, password, database).
+	Nothing is written to disk. Consume the batches of a table before fetching the next table.'''
+	logger = NullLogger()
+	if source == None:
+		client = SQLClient(logger, sample=sample, **login)
+		try:
+			for tablename, colnames, rows in client.fetchtables(tables=tables):
+				yield {'tablename': tablename, 'colnames': colnames}, batched(rows, batchsize)
+		finally:	# also when caller stops early
+			client.close()
+		return
+	if isinstance(source, (str, Path)) and str(source) != '-':
+		with open(source, 'rb') as dumpfh:
+			is_sqlite = ( dumpfh.read(16) == SQLite.MAGIC )
+		if is_sqlite:
+			sqlite = SQLite(logger, source, readonly=True)
+		else:
+			decoder = SQLDecoder(logger, dumpfile=Path(source), sample=sample, typed=True)
+	else:
+		if str(source) == '-':
+			source = stdin.buffer
+		stream = PeekStream(source)
+		is_sqlite = ( stream.head == SQLite.MAGIC )
+		if is_sqlite:
+			sqlite = SQLite(logger, ':memory:')
+			sqlite.deserialize(stream.read())
+		else:
+			decoder = SQLDecoder(logger, stream=stream, sample=sample, typed=True)
+	if is_sqlite:
+		try:
+			for tablename in sqlite.tablenames():
+				if tables == None or tablename in tables:
+					rows = sqlite.fetchall(tables=[tablename], sample=sample)
+					yield next(rows), batched(rows, batchsize)
+		finally:	# also when caller stops early
+			sqlite.close()
+	else:
+		try:
+			yield from DumpTables(decoder, batchsize=batchsize, tables=tables)
+		finally:	# also when caller stops early
+			decoder.close()
+
+WRITERS = {	# output formats, writers import their dependencies when used
+	'xlsx': Excel,
+	'xlsx-stream': ExcelStream,
+	'csv': Csv,
+	'parquet': Parquet
+}
+
 class Worker:
 	'Main class'
 
-	def __init__(self, Writer,
+	CACHEFILE = 'sqldump2xlsx_cache.json'
+	SQLITE = 'generated SQLite db'	# marks the db in the cache file
+	LOGFILE = 'logfile'	# marks the logfile in the cache file
+
+	def __init__(self, Writers,
 		outdir = None,
 		sqlitefile = None,
 		logfile = None,
 		info = None,
-		maxfieldsize = 255
+		maxfieldsize = 255,
+		tables = None,
+		index = False,
+		pipeline = False,
+		batchsize = 1000,
+		queuesize = 64,
+		cache = False,
+		reusedir = None,
+		sample = 0,
+		randomsample = False,
+		chunksize = 0,
+		connections = 1,
+		retries = 3
 	):
-		'Generate the worker'
-		self.Writer = Writer
+		'Generate the worker, give one Writer class, a list of them or None'
+		if Writers == None:
+			self.Writers = list()
+		elif isinstance(Writers, (list, tuple)):
+			self.Writers = list(Writers)
+		else:
+			self.Writers = [Writers]
+		if len({ Writer.EXTENSION for Writer in self.Writers }) < len(self.Writers):
+			raise RuntimeError('Output formats need different file extensions')
+		for Writer in self.Writers:	# fail now, not after parsing the whole dump
+			if Writer.REQUIRES == None:
+				continue
+			from importlib.util import find_spec	# import only when needed
+			if find_spec(Writer.REQUIRES) == None:
+				raise RuntimeError(f'Module {Writer.REQUIRES} is needed to write {Writer.EXTENSION} files by {Writer.__name__}')
 		self.outdir = outdir
 		self.sqlitefile = sqlitefile
 		self.logger = Logger(logfile=logfile, info=info)
 		self.maxfieldsize = maxfieldsize
+		self.tables = tables
+		self.index = index
+		self.pipeline = pipeline
+		self.batchsize = batchsize
+		self.queuesize = queuesize
+		self.reusedir = reusedir
+		self.cache = cache or reusedir != None
+		self.sample = sample
+		self.randomsample = randomsample
+		self.chunksize = chunksize
+		self.connections = connections
+		self.retries = retries
+		self.fingerprints = dict()
+		self.dumpindex = None
 
 	def write(self):
-		'Write to file with given class Witer'
-		if self.Writer == None:
-			return		
-		thistable = None
-		for row in self.sqlite.fetchall():
-			if row == thistable:
-				continue
-			if isinstance(row, dict):
-				try:
-					writetable.close()
-				except NameError:
-					pass
-				writetable = self.Writer(row,
-					outdir=self.outdir,
-					maxfieldsize=self.maxfieldsize
-				)
-				thistable = row
-			elif row != None:
-				writetable.append(row)
+		'Write to files with given Writer classes'
+		if self.Writers == list():
+			self.save_cache()
+			return
+		tablenames = self.selected(self.sqlite.tablenames())
+		if tablenames == list():
+			raise RuntimeError('No files generated')
+		for tablename in tablenames:
+			self.write_table(self.sqlite, tablename)
+		self.prune_cache(tablenames)
+		self.save_cache()
+
+	def selected(self, tablenames):
+		'Filter table names if only given tables are to be fetched'
+		if self.tables == None:
+			return tablenames
+		return [ tablename for tablename in tablenames if tablename in self.tables ]
+
+	def load_cache(self, cachedir):
+		'Read fingerprints of generated files'
 		try:
+			with open(cachedir / self.CACHEFILE, 'rt', encoding='utf8') as cachefh:
+				return jsonload(cachefh)
+		except (OSError, ValueError):
+			return dict()
+
+	def prune_cache(self, tablenames):
+		'Remove files and fingerprints of tables that are not in the source any more, not if only given tables are fetched'
+		if not self.cache or self.tables != None:
+			return
+		extensions = [ Writer.EXTENSION for Writer in self.Writers ]
+		for filename in list(self.fingerprints):
+			for extension in extensions:
+				if filename.endswith(extension) and not filename[:-len(extension)] in tablenames:
+					self.logger.put(f'Removing {filename} from previous run, table is not in the source any more')
+					( self.outdir / filename ).unlink(missing_ok=True)
+					del self.fingerprints[filename]
+					break
+
+	def prune_logs(self):
+		'Remove logfiles of previous runs that are recorded in the cache'
+		for filename, fingerprint in list(self.fingerprints.items()):
+			if fingerprint == self.LOGFILE:
+				( self.outdir / filename ).unlink(missing_ok=True)
+				del self.fingerprints[filename]
+
+	def save_cache(self):
+		'Write fingerprints of generated files into destination directory'
+		if self.cache and self.outdir != None:
+			with open(self.outdir / self.CACHEFILE, 'wt', encoding='utf8') as cachefh:
+				jsondump(self.fingerprints, cachefh, indent=1)
+
+	def reuse(self, filename, fingerprint):
+		'Keep unchanged file or hard link it from directory of previous run'
+		outfile = self.outdir / filename
+		if self.fingerprints.get(filename) == fingerprint and outfile.exists():
+			self.logger.put(f'Table in {filename} is unchanged, file is kept')
+			return True
+		self.fingerprints.pop(filename, None)
+		if self.reusedir == None or self.reuse_fingerprints.get(filename) != fingerprint:
+			return False
+		reusefile = self.reusedir / filename
+		if not reusefile.exists():
+			return False
+		outfile.unlink(missing_ok=True)
+		try:
+			link(reusefile, outfile)
+			self.logger.put(f'Table in {filename} is unchanged, linked from {reusefile.resolve()}')
+		except OSError:
+			copy2(reusefile, outfile)
+			self.logger.put(f'Table in {filename} is unchanged, copied from {reusefile.resolve()}')
+		self.fingerprints[filename] = fingerprint
+		return True
+
+	def write_table(self, sqlite, tablename):
+		'Write one table to files with given Writer classes, rows are read once'
+		Writers = self.Writers
+		if self.cache:
+			content = sqlite.fingerprint(tablename)
+			fingerprints = dict()
+			Writers = list()
+			for Writer in self.Writers:
+				filename = tablename + Writer.EXTENSION
+				fingerprint = sha256(
+					f'{Writer.__name__} {self.maxfieldsize} {self.sample} {self.randomsample} {content}'.encode('utf8')
+				).hexdigest()
+				if self.reuse(filename, fingerprint):
+					continue
+				( self.outdir / filename ).unlink(missing_ok=True)	# do not overwrite hard linked file
+				fingerprints[filename] = fingerprint
+				Writers.append(Writer)
+			if Writers == list():
+				return
+		rows = sqlite.fetchall(tables=[tablename], sample=self.sample, randomsample=self.randomsample)
+		table = next(rows)
+		if len(Writers) == 1:
+			writetable = Writers[0](table,
+				outdir=self.outdir,
+				maxfieldsize=self.maxfieldsize
+			)
+			for row in rows:
+				writetable.append(row)
 			writetable.close()
-		except:
-			raise RuntimeError('No files generated')
+		else:	# fan out to one thread per writer
+			writetables = list()
+			try:	# build all writers before any thread is started
+				for Writer in Writers:
+					writetables.append(Writer(table,
+						outdir=self.outdir,
+						maxfieldsize=self.maxfieldsize
+					))
+			except Exception:
+				for writetable in writetables:	# do not leave files open
+					try:
+						writetable.close()
+					except Exception:
+						pass
+				raise
+			sinks = [ Sink(writetable, queuesize=self.queuesize) for writetable in writetables ]
+			try:
+				for batch in batched(rows, self.batchsize):
+					for sink in sinks:
+						sink.put(batch)
+			finally:	# every sink is closed, then the first error is raised
+				errors = [ sink.close() for sink in sinks ]
+			for error in errors:
+				if error != None:
+					raise error
+		if self.cache:
+			self.fingerprints.update(fingerprints)
+
+	def fill(self, Source, method, total=None, **kwargs):
+		'Fill SQLite db from SQL dump decoder or SQL client, then write'
+		if self.pipeline:
+			self.run_pipeline(Source, method, **kwargs)
+			return
+		source = Source(self.logger, **kwargs)
+		self.sqlite.fill(getattr(source, method), total=total)
+		self.write()
+		source.close()
+
+	def export(self, exportqueue, stage):
+		'Write tables given by queue, runs as thread'
+		sqlite = SQLite(self.logger, self.sqlitefile)
+		sqlite.digests = self.sqlite.digests	# hashes are built by the ingest
+		self.export_error = None
+		while True:
+			stage.waiting()
+			tablename = exportqueue.get()
+			stage.working()
+			if tablename == None:
+				break
+			if self.export_error != None:	# drain queue after error
+				continue
+			try:
+				self.write_table(sqlite, tablename)
+			except Exception as ex:
+				self.export_error = ex
+		stage.waiting()
+		sqlite.close()
+
+	def run_pipeline(self, Source, method, **kwargs):
+		'Parse in own process, ingest into SQLite and export each table as soon as it is complete'
+		from multiprocessing import Process, Queue as ProcessQueue	# import only when needed
+		queue = ProcessQueue(maxsize=self.queuesize)
+		parser = Process(
+			target = Parser(queue, Source, method, batchsize=self.batchsize, **kwargs).run,
+			daemon = True
+		)
+		parser.start()
+		self.sqlite.cursor.execute('PRAGMA journal_mode=WAL;')	# export can read while ingest writes
+		stages = list()
+		if self.Writers != list():
+			exportqueue = Queue(maxsize=self.queuesize)
+			exportstage = Stage('export')
+			exporter = Thread(target=self.export, args=(exportqueue, exportstage), daemon=True)
+			exporter.start()
+		ingeststage = Stage('ingest')
+		exported = set()
+		current = None
+		has_rows = False
+		while True:
+			ingeststage.waiting()
+			try:
+				msg = queue.get(timeout=1)
+			except Empty:
+				if parser.is_alive():
+					continue
+				raise RuntimeError('Parser process terminated unexpectedly')
+			ingeststage.working()
+			if msg[0] == 'log':
+				self.logger.put(msg[1])
+				continue
+			if msg[0] == 'error':
+				raise RuntimeError('Parser process failed:\n' + msg[1])
+			if msg[0] == 'done':
+				stages.append(Stage('parse', busy=msg[1], wait=msg[2]))
+				break
+			tablename, batch = msg[1], msg[2]
+			if tablename != current:
+				if has_rows and self.Writers != list() and current in self.selected([current]):
+					self.sqlite.db.commit()	# previous table is complete
+					ingeststage.waiting()
+					exportqueue.put(current)
+					ingeststage.working()
+					exported.add(current)
+				current = tablename
+				has_rows = False
+			if tablename in exported:
+				self.logger.put(f'Table {tablename} got more data after export, will be exported again')
+				exported.remove(tablename)
+			for cmd_str, values in batch:
+				self.sqlite.execute(cmd_str, values)
+				if values:
+					has_rows = True
+		self.sqlite.db.commit()
+		ingeststage.waiting()
+		stages.append(ingeststage)
+		parser.join()
+		if self.Writers != list():
+			tablenames = self.selected(self.sqlite.tablenames())
+			if tablenames == list():
+				raise RuntimeError('No files generated')
+			for tablename in tablenames:
+				if not tablename in exported:
+					exportqueue.put(tablename)
+			exportqueue.put(None)
+			exporter.join()
+			stages.append(exportstage)
+			if self.export_error != None:
+				raise self.export_error
+			self.prune_cache(tablenames)
+		self.save_cache()
+		self.sqlite.cursor.execute('PRAGMA journal_mode=DELETE;')
+		for stage in stages:
+			self.logger.put(stage.report())
 
 	def mk_outdir(self, name):
 		'Make outdir and check if emty'
-		if self.Writer != None or self.logger.logfh == None or self.sqlitefile == None:
+		if self.Writers != list() or self.logger.logfh == None or self.sqlitefile == None:
 			if self.outdir == None:
 				self.outdir = Path() / name
 			self.outdir.mkdir(parents=True, exist_ok=True)
-			if any(self.outdir.iterdir()):
+			if self.cache:
+				self.fingerprints = self.load_cache(self.outdir)
+				if self.reusedir != None:
+					self.reuse_fingerprints = self.load_cache(self.reusedir)
+			elif any(self.outdir.iterdir()):
 				raise RuntimeError('Destination directory needs to be emtpy')
 			if self.logger.logfh == None:
+				if self.cache:
+					self.prune_logs()
 				self.logger.logfile_open(outdir=self.outdir)
+				if self.cache:
+					self.fingerprints[self.logger.logfile.name] = self.LOGFILE
 			self.logger.put('Writing into directory ' + str(self.outdir.resolve()))
 
 	def mk_log(self, name):
 		'Make logfile'
-		if self.Writer != None or ( self.sqlitefile == None and self.outdir != None ):
+		if self.Writers != list() or ( self.sqlitefile == None and self.outdir != None ):
 			if self.logger.logfh == None:
 				self.logger.logfile_open(outdir=self.outdir)
 		elif self.logger.logfh == None:
@@ -575,14 +1888,64 @@ class Worker:
 				self.sqlitefile = Path() / ( name + '.db' )
 			else:
 				self.sqlitefile = self.outdir / ( name + '.db' )
+		generated = self.cache and self.outdir != None and self.sqlitefile == self.outdir / ( name + '.db' )
+		if generated and self.fingerprints.get(self.sqlitefile.name) == self.SQLITE and self.sqlitefile.exists():
+			self.logger.put(f'Replacing {str(self.sqlitefile.resolve())} from previous run')
+			self.sqlitefile.unlink()
 		if self.sqlitefile.exists():
 			raise RuntimeError(f'File {str(self.sqlitefile.resolve())} exists')
 		self.sqlite = SQLite(self.logger, self.sqlitefile)
+		if self.cache:
+			self.sqlite.hash_tables()
+		if generated:	# remember to replace the db on the next run
+			self.fingerprints[self.sqlitefile.name] = self.SQLITE
+
+	def check_sqlite(self, dumpfile):
+		'Check if file is a SQLite db or a dump file'
+		with open(dumpfile, 'rb') as dumpfh:
+			self.is_sqlite = ( dumpfh.read(16) == SQLite.MAGIC )
+		return self.is_sqlite
+
+	def listtables(self, dumpfile):
+		'Give names and (estimated) numbers of rows of the tables in a SQL dump or SQLite db file'
+		if str(dumpfile) == '-':
+			raise RuntimeError('Tables cannot be listed when reading from stdin')
+		if self.check_sqlite(dumpfile):
+			sqlite = SQLite(self.logger, dumpfile)
+			tables = [ ( tablename, sqlite.count(tablename) ) for tablename in sqlite.tablenames() ]
+			sqlite.close()
+			return tables
+		dumpindex = self.get_index(dumpfile)
+		return [ ( tablename, table['rows'] ) for tablename, table in dumpindex.tables.items() ]
+
+	def get_index(self, dumpfile):
+		'Load or build index of SQL dump file only once'
+		if self.dumpindex == None:
+			self.dumpindex = DumpIndex(self.logger, dumpfile)
+		return self.dumpindex
+
+	def unknown_tables(self, dumpfile):
+		'Give the requested tables that are not in the SQL dump or SQLite db file, nothing is written but the index'
+		if self.check_sqlite(dumpfile):
+			sqlite = SQLite(self.logger, dumpfile, readonly=True)
+			tablenames = sqlite.tablenames()
+			sqlite.close()
+		else:
+			tablenames = self.get_index(dumpfile).tables
+		return [ tablename for tablename in self.tables if not tablename in tablenames ]
+
+	def dump_sample(self):
+		'Give number of rows to decode per table from dump'
+		if self.randomsample:	# random sample needs all rows in SQLite
+			return 0
+		return self.sample
 
 	def fromfile(self, dumpfile):
-		'Fetch from SQL dump or SQLite db file'
-		with open(dumpfile, 'rb') as dumpfh:	# dumpfile or sqlite db file?
-			self.is_sqlite = ( dumpfh.read(16) == b'SQLite format 3\x00' )
+		'Fetch from SQL dump or SQLite db file, - is stdin'
+		if str(dumpfile) == '-':
+			self.fromstream(PeekStream(stdin.buffer))
+			return
+		self.check_sqlite(dumpfile)
 		self.mk_outdir(dumpfile.stem)
 		self.mk_log(dumpfile.stem)
 		if self.is_sqlite:
@@ -590,27 +1953,59 @@ class Worker:
 			self.write()
 		else:
 			self.mk_sqlite(dumpfile.stem)
-			self.sqldecoder = SQLDecoder(self.logger, dumpfile)
-			self.sqlite.fill(self.sqldecoder.transall)
-			self.write()
-			self.sqldecoder.close()
+			if self.index or self.tables != None:	# seek to tables using index sidecar file
+				dumpindex = self.get_index(dumpfile)
+				segments = dumpindex.segments(tables=self.tables)
+				total = dumpindex.rows(tables=self.tables)
+				self.logger.put(f'Expecting about {total} rows')
+			else:
+				segments = None
+				total = None
+			self.fill(SQLDecoder, 'transall',
+				total = total,
+				dumpfile = dumpfile,
+				segments = segments,
+				sample = self.dump_sample()
+			)
 		self.logger.put(f'All done parsing from {dumpfile.name}')
 		self.logger.close()
 
+	def fromstream(self, stream, name='stdin'):
+		'Fetch from SQL dump or SQLite db given as PeekStream, e.g. from a pipe'
+		self.is_sqlite = ( stream.head == SQLite.MAGIC )
+		self.mk_outdir(name)
+		self.mk_log(name)
+		if self.is_sqlite:
+			self.sqlite = SQLite(self.logger, ':memory:')
+			self.sqlite.deserialize(stream.read())
+			self.write()
+		else:
+			if self.index:
+				raise RuntimeError('Index is not possible when reading from stream')
+			if self.pipeline:	# child process cannot read the stream
+				self.logger.put('Pipeline is not possible when reading from stream, parsing in this process')
+				self.pipeline = False
+			self.mk_sqlite(name)
+			self.fill(SQLDecoder, 'transall', stream=stream, sample=self.dump_sample())
+		self.logger.put(f'All done parsing from {name}')
+		self.logger.close()
+
 	def fromserver(self, host=None, user=None, password=None, database=None):
 		'Fetch from SQL server'
 		self.mk_outdir(database)
 		self.mk_log(database)
 		self.mk_sqlite(database)
-		sqlclient = SQLClient(self.logger,
+		self.fill(SQLClient, 'fetchall',
 			host = host,
 			user = user,
 			password = password,
-			database = database
+			database = database,
+			sample = self.sample,
+			randomsample = self.randomsample,
+			chunksize = self.chunksize,
+			connections = self.connections,
+			retries = self.retries
 		)
-		self.sqlite.fill(sqlclient.fetchall)
-		self.write()
-		sqlclient.close()
 		self.logger.put(f'All done fetching from SQL server')
 		self.logger.close()
 
@@ -634,35 +2029,107 @@ if __name__ == '__main__':	# start here if called as application
 	argparser.add_argument('-p', '--password', type=str, default='root',
 		help='Username to connect to a SQL server (default: root)', metavar='STRING'
 	)
+	argparser.add_argument('--chunk', type=int, default=0,
+		help='Fetch tables from server in chunks by primary key (default: 0 = one query per table)', metavar='INTEGER'
+	)
+	argparser.add_argument('--connections', type=int, default=1,
+		help='Number of connections to fetch chunks in parallel (default: 1)', metavar='INTEGER'
+	)
+	argparser.add_argument('--retries', type=int, default=3,
+		help='Retries for each chunk on errors from server (default: 3)', metavar='INTEGER'
+	)
 	argparser.add_argument('-m', '--max', type=int, default=255,
 		help='Set maximum field size (0 = no limit, default: 255)', metavar='INTEGER'
 	)
 	argparser.add_argument('-l', '--log', type=Path,
 		help='Set logfile (default: *_log.txt in destination directory)', metavar='FILE'
 	)
+	argparser.add_argument('-f', '--format', type=str,
+		help=f'Output file format(s), comma separated, from {",".join(WRITERS)} (default: xlsx)',
+		metavar='STRING'
+	)
 	argparser.add_argument('-c', '--csv', action='store_true',
-		help='Generate CSV files, not Excel'
+		help='Generate CSV files, not Excel (same as --format csv, adds csv if --format is given)'
 	)
 	argparser.add_argument('-x', '--noxlsx', action='store_true',
 		help='Do not generate Excel or CSV, SQLite only (useless if source is SQLite)'
 	)
+	argparser.add_argument('-t', '--table', type=str, action='append',
+		help='Only fetch given table from file, can be used multiple times (uses index)', metavar='STRING'
+	)
+	argparser.add_argument('-i', '--index', action='store_true',
+		help='Use or create index file (*.idx) to seek tables in SQL dump file'
+	)
+	argparser.add_argument('--pipeline', action='store_true',
+		help='Parse in separate process, export tables while ingesting into SQLite'
+	)
+	argparser.add_argument('--sample', type=int, default=0,
+		help='Only fetch the first rows of each table (default: 0 = all rows)', metavar='INTEGER'
+	)
+	argparser.add_argument('--sample-random', type=int, default=0,
+		help='Only fetch randomly selected rows of each table (dump files are parsed completely)', metavar='INTEGER'
+	)
+	argparser.add_argument('-k', '--cache', action='store_true',
+		help='Keep fingerprints of the tables in destination directory, only write changed tables'
+	)
+	argparser.add_argument('-r', '--reuse', type=Path,
+		help='Hard link unchanged files from destination directory of a previous run (implies --cache)',
+		metavar='DIRECTORY'
+	)
+	argparser.add_argument('--list-tables', action='store_true',
+		help='List tables and (estimated) numbers of rows of dump or SQLite file, then exit'
+	)
 	argparser.add_argument('dumpfile', nargs='?', type=Path,
-		help='SQL dump file to read (if none: try to connect  a server)', metavar='FILE'
+		help='SQL dump file to read, - for stdin (if none: try to connect  a server)', metavar='FILE'
 	)
 	args = argparser.parse_args()
-	if args.noxlsx:
-		Writer = None
+	if str(args.dumpfile) == '-':
+		if args.list_tables:
+			argparser.error('--list-tables is not possible when reading from stdin')
+		if args.index:
+			argparser.error('--index is not possible when reading from stdin')
+	if args.noxlsx or args.list_tables:	# listing tables writes no files
+		Writers = None
 	else:
-		if args.csv:
-			Writer = Csv
+		if args.format == None:
+			fileformats = ['csv' if args.csv else 'xlsx']
 		else:
-			Writer = Excel
-	worker = Worker(Writer,
-		outdir = args.outdir,
-		sqlitefile = args.sqlite,
-		logfile = args.log,
-		maxfieldsize = args.max
-	)
+			fileformats = [ fileformat.strip() for fileformat in args.format.split(',') ]
+			if args.csv:
+				fileformats.append('csv')
+		try:
+			Writers = [ WRITERS[fileformat] for fileformat in dict.fromkeys(fileformats) ]
+		except KeyError as ex:
+			argparser.error(f'Unknown output file format {ex}')
+	try:
+		worker = Worker(Writers,
+			outdir = args.outdir,
+			sqlitefile = args.sqlite,
+			logfile = args.log,
+			maxfieldsize = args.max,
+			tables = args.table,
+			index = args.index,
+			pipeline = args.pipeline,
+			cache = args.cache,
+			reusedir = args.reuse,
+			sample = args.sample_random or args.sample,
+			randomsample = args.sample_random > 0,
+			chunksize = args.chunk,
+			connections = args.connections,
+			retries = args.retries
+		)
+	except RuntimeError as ex:	# e.g. output formats with the same file extension or missing module
+		argparser.error(ex)
+	if args.list_tables:
+		if args.dumpfile == None:
+			argparser.error('--list-tables requires a file')
+		for tablename, rows in worker.listtables(args.dumpfile):
+			print(f'{tablename}\t{rows}')
+		sysexit(0)
+	if args.table != None and args.dumpfile != None and str(args.dumpfile) != '-':
+		unknown = worker.unknown_tables(args.dumpfile)
+		if unknown:
+			argparser.error(f'Table(s) not found in {args.dumpfile.name}: {", ".join(unknown)}')
 	if args.dumpfile == None:
 		worker.fromserver(
 			host = args.host,
@@ -17,7 +17,7 @@ from tkinter.scrolledtext import ScrolledText
 from datetime import datetime
 from sys import stderr, stdout
 from pathlib import Path
-from sqldump2xlsx import Worker, Excel, Csv
+from sqldump2xlsx import Worker, WRITERS
 
 class Main(Tk):
 	'Main window'
@@ -144,15 +144,15 @@ class Main(Tk):
 			if any(outdir.iterdir()):
 				showerror('Error', 'Destination directory needs to be emtpy')
 				return
-			if self.fileformat.get() == 'csv':
-				Writer = Csv
-			else:
-				Writer = Excel
-			worker = Worker(Writer,
-				outdir = outdir,
-				maxfieldsize = self.maximum.get(),
-				info=self.info_handler
-			)
+			try:
+				worker = Worker(WRITERS[self.fileformat.get()],
+					outdir = outdir,
+					maxfieldsize = self.maximum.get(),
+					info=self.info_handler
+				)
+			except RuntimeError as ex:
+				showerror('Error', str(ex))
+				return
 		if source == 'file':
 			worker.fromfile(Path(self.filename.get()))
 		else: